@@ -0,0 +1,53 @@
+"""Indices de busqueda por numero_de_contacto
+
+Revision ID: 3b9e1f4a2c7d
+Revises: 7dff8b59ef32
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1f4a2c7d'
+down_revision: Union[str, None] = '7dff8b59ef32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+
+    # CONCURRENTLY no puede correr dentro de una transaccion y evita bloquear
+    # las escrituras en cabecera_chat mientras se construyen los indices
+    with op.get_context().autocommit_block():
+        # Busqueda por prefijo: B-tree en collation "C", sirve tanto para
+        # LIKE 'prefijo%' como para el ORDER BY, asi el LIMIT corta el scan
+        op.create_index(
+            'ix_cabecera_chat_cuenta_id_numero_prefijo',
+            'cabecera_chat',
+            ['cuenta_id', sa.text('numero_de_contacto COLLATE "C"')],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        # Busqueda por fragmento: GIN con cuenta_id (btree_gin) y trigramas
+        # del numero, para no recorrer coincidencias de otras cuentas
+        op.create_index(
+            'ix_cabecera_chat_cuenta_id_numero_trgm',
+            'cabecera_chat',
+            ['cuenta_id', 'numero_de_contacto'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'numero_de_contacto': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_cabecera_chat_cuenta_id_numero_trgm', table_name='cabecera_chat', postgresql_concurrently=True)
+        op.drop_index('ix_cabecera_chat_cuenta_id_numero_prefijo', table_name='cabecera_chat', postgresql_concurrently=True)
@@ -0,0 +1,77 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+import gzip
+import anyio
+import zstandard
+
+from .negociacion import parsear_calidades
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    rangos = parsear_calidades(accept_encoding)
+
+    def calidad(codificacion: str) -> float:
+        for candidato in (codificacion, "*"):
+            calidades = [q for valor, q in rangos if valor == candidato]
+            if calidades:
+                return max(calidades)
+        return 0.0
+
+    # zstd comprime mas rapido que gzip con un tamaño similar: se usa siempre
+    # que el cliente lo acepte al menos con la misma preferencia que gzip
+    q_zstd, q_gzip = calidad("zstd"), calidad("gzip")
+    if q_zstd > 0 and q_zstd >= q_gzip:
+        return "zstd"
+    if q_gzip > 0:
+        return "gzip"
+    return None
+
+class CompresionMiddleware:
+    # Comprime respuestas de al menos minimum_size bytes con zstd o gzip segun Accept-Encoding.
+    # El cuerpo se junta completo y se comprime en un thread, para no frenar el event loop con
+    # listados grandes; no usar con respuestas en streaming
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, zstd_level: int = 3) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    def comprimir(self, codificacion: str, cuerpo: bytes) -> bytes:
+        if codificacion == "zstd":
+            # ZstdCompressor no es thread-safe: uno nuevo por llamada
+            return zstandard.ZstdCompressor(level=self.zstd_level).compress(cuerpo)
+        return gzip.compress(cuerpo, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        partes = []
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio
+            if message["type"] == "http.response.start":
+                inicio = message
+                return
+            partes.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            cuerpo = b"".join(partes)
+            headers = MutableHeaders(raw=inicio["headers"])
+            if len(cuerpo) >= self.minimum_size and "content-encoding" not in headers:
+                cuerpo = await anyio.to_thread.run_sync(self.comprimir, codificacion, cuerpo)
+                headers["Content-Encoding"] = codificacion
+                headers["Content-Length"] = str(len(cuerpo))
+                headers.add_vary_header("Accept-Encoding")
+            await send(inicio)
+            await send({"type": "http.response.body", "body": cuerpo})
+
+        await self.app(scope, receive, enviar)
@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from datetime import datetime
+import os
 
 from .security import validate_api_key
+from .negociacion import negociar
+from .compresion import CompresionMiddleware
 from . import models, schemas
 from .database import engine, get_db
 
@@ -11,6 +15,14 @@ models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="WhatsApp Business API")
 
+# Compresion de respuestas grandes (listados): zstd si el cliente lo acepta, si no gzip
+app.add_middleware(
+    CompresionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000")),
+    gzip_level=int(os.getenv("GZIP_COMPRESSLEVEL", "6")),
+    zstd_level=int(os.getenv("ZSTD_LEVEL", "3"))
+)
+
 ################################################################
 # Endpoints para Cuenta
 ################################################################
@@ -23,16 +35,17 @@ def crear_cuenta(cuenta: schemas.CuentaCreate, db: Session = Depends(get_db)):
     return db_cuenta
 
 @app.get("/cuentas/", response_model=List[schemas.Cuenta], dependencies=[Depends(validate_api_key)])
-def listar_cuentas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(models.Cuenta).offset(skip).limit(limit).all()
+def listar_cuentas(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    cuentas = db.query(models.Cuenta).offset(skip).limit(limit).all()
+    return negociar(request, response, cuentas, schemas.Cuenta)
 
 # Buscar cuenta por instancia_evolution
 @app.get("/cuentas/instancia/{instancia_evolution}", response_model=schemas.Cuenta, dependencies=[Depends(validate_api_key)])
-def buscar_cuenta_por_instancia(instancia_evolution: str, db: Session = Depends(get_db)):
+def buscar_cuenta_por_instancia(request: Request, response: Response, instancia_evolution: str, db: Session = Depends(get_db)):
     cuenta = db.query(models.Cuenta).filter(models.Cuenta.instancia_evolution == instancia_evolution).first()
     if not cuenta:
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
-    return cuenta
+    return negociar(request, response, cuenta, schemas.Cuenta)
 
 # Sumar mensaje enviado a cuenta
 @app.post("/cuentas/sumar-mensaje-enviado/{cuenta_id}", dependencies=[Depends(validate_api_key)])
@@ -123,8 +136,57 @@ def crear_o_obtener_chat(chat: schemas.CabeceraChatCreate, db: Session = Depends
         }
 
 @app.get("/chats/cuenta/{cuenta_id}", response_model=List[schemas.CabeceraChat], dependencies=[Depends(validate_api_key)])
-def listar_chats_por_cuenta(cuenta_id: int, db: Session = Depends(get_db)):
-    return db.query(models.CabeceraChat).filter(models.CabeceraChat.cuenta_id == cuenta_id).all()
+def listar_chats_por_cuenta(request: Request, response: Response, cuenta_id: int, db: Session = Depends(get_db)):
+    chats = db.query(models.CabeceraChat).filter(models.CabeceraChat.cuenta_id == cuenta_id).all()
+    return negociar(request, response, chats, schemas.CabeceraChat)
+
+def consulta_busqueda_chats(db: Session, cuenta_id: int, q: str, modo: str, etiqueta_id: Optional[List[int]], limit: int):
+    # En collation "C" el orden coincide con el indice ix_cabecera_chat_cuenta_id_numero_prefijo:
+    # recorrerlo en orden permite que el LIMIT corte el scan
+    numero = models.CabeceraChat.numero_de_contacto.collate("C")
+    if modo == "prefijo":
+        filtro_numero = numero.startswith(q, autoescape=True)
+    else:
+        # El indice de trigramas se lee con un Bitmap Index Scan, que junta todas
+        # las coincidencias de la cuenta antes de aplicar el LIMIT; con fragmentos
+        # comunes eso es caro. El ORDER BY le deja al planner la alternativa de
+        # recorrer el B-tree en orden filtrando el LIKE hasta juntar `limit` filas,
+        # que elige cuando las estadisticas indican que el fragmento es frecuente
+        filtro_numero = models.CabeceraChat.numero_de_contacto.contains(q, autoescape=True)
+
+    query = db.query(models.CabeceraChat).filter(
+        models.CabeceraChat.cuenta_id == cuenta_id,
+        filtro_numero
+    )
+
+    # Filtrar por chats que tengan alguna de las etiquetas indicadas
+    if etiqueta_id:
+        chats_con_etiqueta = select(models.ChatEtiqueta.chat_id).where(
+            models.ChatEtiqueta.cuenta_id == cuenta_id,
+            models.ChatEtiqueta.etiqueta_id.in_(etiqueta_id)
+        )
+        query = query.filter(models.CabeceraChat.id.in_(chats_con_etiqueta))
+
+    return query.order_by(numero).limit(limit)
+
+# Buscar chats de una cuenta por fragmento del numero_de_contacto
+@app.get("/chats/cuenta/{cuenta_id}/buscar", response_model=List[schemas.CabeceraChat], dependencies=[Depends(validate_api_key)])
+def buscar_chats_por_numero(
+    request: Request,
+    response: Response,
+    cuenta_id: int,
+    q: str = Query(..., min_length=1, max_length=32),
+    modo: Literal["prefijo", "contiene"] = "prefijo",
+    etiqueta_id: Optional[List[int]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    # El indice de trigramas solo sirve con fragmentos de 3 o mas caracteres
+    if modo == "contiene" and len(q) < 3:
+        raise HTTPException(status_code=400, detail="La busqueda por fragmento requiere al menos 3 caracteres")
+
+    chats = consulta_busqueda_chats(db, cuenta_id, q, modo, etiqueta_id, limit).all()
+    return negociar(request, response, chats, schemas.CabeceraChat)
 
 # Crear ruta para sumar intentos malintencionados en la cabecera del chat
 @app.post("/chats/intento-malicioso/", dependencies=[Depends(validate_api_key)])
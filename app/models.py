@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKeyConstraint, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, ForeignKeyConstraint, Index, Integer, String, DateTime, Boolean, ForeignKey, DDL, event, text
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -30,6 +30,22 @@ class CabeceraChat(Base):
     numero_de_contacto = Column(String)
     intentos_maliciosos = Column(Integer, default=0)
 
+    # Indices de busqueda por numero_de_contacto (ver migracion 3b9e1f4a2c7d)
+    __table_args__ = (
+        Index(
+            'ix_cabecera_chat_cuenta_id_numero_prefijo',
+            'cuenta_id',
+            text('numero_de_contacto COLLATE "C"')
+        ),
+        Index(
+            'ix_cabecera_chat_cuenta_id_numero_trgm',
+            'cuenta_id',
+            'numero_de_contacto',
+            postgresql_using='gin',
+            postgresql_ops={'numero_de_contacto': 'gin_trgm_ops'}
+        ),
+    )
+
     # Relaciones
     cuenta = relationship("Cuenta", back_populates="cabeceras_chat")
     etiquetas = relationship(
@@ -38,6 +54,14 @@ class CabeceraChat(Base):
     )
 
 
+# El indice de trigramas necesita pg_trgm y btree_gin cuando la tabla se crea con create_all
+event.listen(
+    CabeceraChat.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm; CREATE EXTENSION IF NOT EXISTS btree_gin").execute_if(dialect="postgresql")
+)
+
+
 class Etiqueta(Base):
     __tablename__ = "etiqueta"
     
@@ -0,0 +1,71 @@
+from fastapi import Request, Response
+from typing import Any, List, Optional, Tuple, Type
+from pydantic import BaseModel
+import msgpack
+
+# Tipos de contenido aceptados para respuestas codificadas con MessagePack
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/msgpack")
+JSON_MEDIA_TYPE = "application/json"
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+def parsear_calidades(header: str) -> List[Tuple[str, float]]:
+    # Convierte "a;q=0.5, b" en [("a", 0.5), ("b", 1.0)]; sirve para Accept y Accept-Encoding
+    valores = []
+    for parte in header.split(","):
+        valor, *parametros = [p.strip() for p in parte.split(";")]
+        if not valor:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            nombre, _, dato = parametro.partition("=")
+            if nombre.strip().lower() == "q":
+                try:
+                    q = float(dato)
+                except ValueError:
+                    q = 0.0
+        valores.append((valor.lower(), q))
+    return valores
+
+def calidad_media_type(rangos: List[Tuple[str, float]], media_type: str) -> float:
+    # Gana el rango mas especifico que coincida: "tipo/subtipo", luego "tipo/*", luego "*/*"
+    tipo = media_type.split("/")[0]
+    for candidato in (media_type, f"{tipo}/*", "*/*"):
+        calidades = [q for rango, q in rangos if rango == candidato]
+        if calidades:
+            return max(calidades)
+    return 0.0
+
+def media_type_msgpack(request: Request) -> Optional[str]:
+    # Devuelve el tipo MessagePack que gano la negociacion, o None si corresponde JSON
+    rangos = parsear_calidades(request.headers.get("accept", ""))
+    nombrados = {rango for rango, _ in rangos}
+    # Ante igual calidad gana el tipo que el cliente nombro explicitamente, y si no el primero
+    media_type = max(
+        MSGPACK_MEDIA_TYPES,
+        key=lambda candidato: (calidad_media_type(rangos, candidato), candidato in nombrados)
+    )
+    q_msgpack = calidad_media_type(rangos, media_type)
+    # JSON sigue siendo el formato por defecto: MessagePack solo si el cliente lo prefiere
+    if q_msgpack > 0 and q_msgpack > calidad_media_type(rangos, JSON_MEDIA_TYPE):
+        return media_type
+    return None
+
+def negociar(request: Request, response: Response, contenido: Any, schema: Type[BaseModel]):
+    # La misma URL responde JSON o MessagePack segun Accept, los caches deben distinguirlos
+    media_type = media_type_msgpack(request)
+    if media_type is None:
+        # Se devuelve el contenido tal cual y FastAPI lo serializa a JSON con el
+        # response_model del endpoint, agregando los headers de response
+        response.headers["Vary"] = "Accept"
+        return contenido
+    if isinstance(contenido, list):
+        datos: Any = [schema.model_validate(item).model_dump(mode="json") for item in contenido]
+    else:
+        datos = schema.model_validate(contenido).model_dump(mode="json")
+    return MsgPackResponse(content=datos, media_type=media_type, headers={"Vary": "Accept"})
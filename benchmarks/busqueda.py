@@ -0,0 +1,105 @@
+"""Mide la latencia de GET /chats/cuenta/{cuenta_id}/buscar contra la base configurada.
+
+Ejecuta EXPLAIN (ANALYZE, BUFFERS) de la misma consulta que arma el endpoint
+y luego la repite para obtener p50/p95. Sale con codigo 1 si algun p95 supera
+el objetivo de 50 ms.
+
+Uso:
+    python -m benchmarks.busqueda --cuenta-id 1
+    python -m benchmarks.busqueda --poblar 5000000 --cuentas 20
+
+--poblar inserta chats sinteticos (numeros "549" + 10 digitos) repartidos en
+cuentas nuevas y usa la primera de ellas; hacerlo solo en una base de pruebas.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.database import SessionLocal
+from app.main import consulta_busqueda_chats
+
+OBJETIVO_MS = 50
+
+# (q, modo): prefijos cortos y largos, y fragmentos de final de numero
+CASOS = [
+    ("5", "prefijo"),
+    ("549", "prefijo"),
+    ("5491234", "prefijo"),
+    ("123", "contiene"),
+    # Peor caso del indice de trigramas: todos los numeros sinteticos contienen "549"
+    ("549", "contiene"),
+    ("98765", "contiene"),
+]
+
+
+def poblar(db, chats, cuentas):
+    ids = db.execute(text(
+        "INSERT INTO cuenta (nombre_cuenta, instancia_evolution, eliminado, total_mensajes_enviados) "
+        "SELECT 'benchmark-busqueda-' || i, 'benchmark-busqueda-' || i, false, 0 "
+        "FROM generate_series(1, :cuentas) i RETURNING id"
+    ), {"cuentas": cuentas}).scalars().all()
+    db.execute(text(
+        "INSERT INTO cabecera_chat (cuenta_id, numero_de_contacto, created_at, intentos_maliciosos) "
+        "SELECT (:ids)[1 + i % :cuentas], '549' || lpad((random() * 1e10)::bigint::text, 10, '0'), now(), 0 "
+        "FROM generate_series(1, :chats) i"
+    ), {"ids": ids, "cuentas": cuentas, "chats": chats})
+    db.commit()
+    db.execute(text("ANALYZE cabecera_chat"))
+    return ids[0]
+
+
+def medir(db, cuenta_id, q, modo, limit, repeticiones):
+    query = consulta_busqueda_chats(db, cuenta_id, q, modo, None, limit)
+    sql = str(query.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    plan = db.connection().exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + sql).scalars().all()
+    print(f"--- q={q!r} modo={modo}")
+    print("\n".join(plan))
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        query.all()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    p50 = statistics.median(tiempos)
+    p95 = statistics.quantiles(tiempos, n=20)[-1]
+    print(f"p50 {p50:.2f} ms  p95 {p95:.2f} ms\n")
+    return p95
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cuenta-id", type=int)
+    parser.add_argument("--poblar", type=int, default=0, help="cantidad de chats sinteticos a insertar")
+    parser.add_argument("--cuentas", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cuenta_id = args.cuenta_id
+        if args.poblar:
+            cuenta_id = poblar(db, args.poblar, args.cuentas)
+        if cuenta_id is None:
+            parser.error("indicar --cuenta-id o --poblar")
+
+        total = db.execute(
+            text("SELECT count(*) FROM cabecera_chat WHERE cuenta_id = :cuenta_id"), {"cuenta_id": cuenta_id}
+        ).scalar()
+        print(f"cuenta {cuenta_id}: {total:,} chats\n")
+
+        peor = max(medir(db, cuenta_id, q, modo, args.limit, args.repeticiones) for q, modo in CASOS)
+    finally:
+        db.close()
+
+    print(f"peor p95: {peor:.2f} ms (objetivo {OBJETIVO_MS} ms)")
+    sys.exit(1 if peor > OBJETIVO_MS else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compara tamaño y tiempo de codificacion de un listado de chats sintetico.
+
+Mide los mismos caminos que usan los endpoints de listado a partir de objetos
+models.CabeceraChat: JSON con el serializador de FastAPI (response_model +
+JSONResponse) y MessagePack con negociar(), y luego cada cuerpo comprimido con
+gzip y zstd como lo hace CompresionMiddleware.
+
+Uso:
+    python -m benchmarks.serializacion [cantidad_de_chats]
+"""
+from datetime import datetime, timedelta
+from typing import List
+import asyncio
+import gzip
+import random
+import sys
+import time
+
+import zstandard
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models, schemas
+from app.negociacion import MSGPACK_MEDIA_TYPE, negociar
+
+
+def generar_chats(cantidad):
+    random.seed(42)
+    inicio = datetime(2025, 1, 1)
+    return [
+        models.CabeceraChat(
+            id=i,
+            cuenta_id=1,
+            numero_de_contacto="549" + "".join(random.choices("0123456789", k=10)),
+            created_at=inicio + timedelta(seconds=random.randint(0, 30_000_000)),
+            bloqueado_at=None,
+            intentos_maliciosos=random.choice([0, 0, 0, 1, 2]),
+        )
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def request_con_accept(accept):
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+def medir(nombre, codificar, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        datos = codificar()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"{nombre:<22}{len(datos):>12,} bytes{mejor * 1000:>12.2f} ms")
+    return datos
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    chats = generar_chats(cantidad)
+    print(f"{cantidad:,} chats sinteticos\n")
+
+    # Camino JSON: validacion con response_model y render de JSONResponse, como en FastAPI
+    campo = create_response_field(name="Response_listar_chats", type_=List[schemas.CabeceraChat])
+
+    def codificar_json():
+        contenido = asyncio.run(serialize_response(field=campo, response_content=chats))
+        return JSONResponse(contenido).body
+
+    # Camino MessagePack: negociar() con Accept: application/x-msgpack
+    request_msgpack = request_con_accept(MSGPACK_MEDIA_TYPE)
+
+    def codificar_msgpack():
+        return negociar(request_msgpack, Response(), chats, schemas.CabeceraChat).body
+
+    cuerpos = {
+        "json": medir("json", codificar_json),
+        "msgpack": medir("msgpack", codificar_msgpack),
+    }
+    print()
+    for formato, cuerpo in cuerpos.items():
+        for nivel in (1, 6, 9):
+            medir(f"{formato} + gzip({nivel})", lambda: gzip.compress(cuerpo, compresslevel=nivel))
+        for nivel in (1, 3, 9):
+            compresor = zstandard.ZstdCompressor(level=nivel)
+            medir(f"{formato} + zstd({nivel})", lambda: compresor.compress(cuerpo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi import Request
+
+from app.compresion import CompresionMiddleware, elegir_codificacion
+from app.negociacion import media_type_msgpack
+
+
+def request_con_accept(accept):
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.parametrize("accept, esperado", [
+    ("*/*", None),
+    ("", None),
+    ("application/json", None),
+    ("application/x-msgpack", "application/x-msgpack"),
+    ("application/json;q=0.5, application/x-msgpack", "application/x-msgpack"),
+    ("application/json;q=0.9, application/msgpack", "application/msgpack"),
+    ("application/x-msgpack;q=0, application/json", None),
+    ("application/*, application/msgpack;q=0.9", None),
+])
+def test_media_type_msgpack(accept, esperado):
+    assert media_type_msgpack(request_con_accept(accept)) == esperado
+
+
+@pytest.mark.parametrize("accept_encoding, esperado", [
+    ("gzip, deflate, br, zstd", "zstd"),
+    ("gzip;q=1, zstd;q=0.5", "gzip"),
+    ("*", "zstd"),
+    ("gzip;q=0", None),
+    ("gzip;q=0, zstd", "zstd"),
+    ("identity", None),
+    ("", None),
+])
+def test_elegir_codificacion(accept_encoding, esperado):
+    assert elegir_codificacion(accept_encoding) == esperado
+
+
+def responder(cuerpo, accept_encoding, minimum_size):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"vary", b"Accept"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
+
+    mensajes = []
+
+    async def send(message):
+        mensajes.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompresionMiddleware(app, minimum_size=minimum_size)(scope, None, send))
+    inicio, cuerpo_enviado = mensajes
+    return {k.decode(): v.decode() for k, v in inicio["headers"]}, cuerpo_enviado["body"]
+
+
+def test_cuerpo_menor_a_minimum_size_no_se_comprime():
+    cuerpo = b'{"id": 1}'
+    headers, enviado = responder(cuerpo, "gzip", minimum_size=1000)
+    assert enviado == cuerpo
+    assert "content-encoding" not in headers
+    assert headers["content-length"] == str(len(cuerpo))
+
+
+def test_respuesta_comprimida_reescribe_headers():
+    cuerpo = b'{"numero_de_contacto": "5491100000000"}' * 100
+    headers, enviado = responder(cuerpo, "gzip", minimum_size=500)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-length"] == str(len(enviado))
+    assert headers["vary"] == "Accept, Accept-Encoding"
+    assert gzip.decompress(enviado) == cuerpo